@@ -1,24 +1,24 @@
 """
 Pytest configuration and shared fixtures for movie generation platform tests.
 """
+import array
 import asyncio
+import atexit
+import functools
 import os
 import pytest
 import logging
 import time
-from typing import Dict, Any, AsyncGenerator, Generator
-from contextlib import asynccontextmanager
-import websockets
+import types
+from typing import Dict, Any, AsyncGenerator, Generator, Optional
+from contextlib import asynccontextmanager, suppress
 import httpx
-import docker
+import orjson
 from unittest.mock import AsyncMock, MagicMock
 
-# Configure logging for tests
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+# Log output is controlled by pytest's log_cli settings rather than the root logger
 logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
 
 # Test configuration
 TEST_CONFIG = {
@@ -59,13 +59,31 @@ TIMEOUTS = {
     "embedding_generation": 15
 }
 
-
-@pytest.fixture(scope="session")
-def event_loop():
-    """Create event loop for the test session."""
-    loop = asyncio.new_event_loop()
-    yield loop
-    loop.close()
+# Freeze shared configuration so a test can't mutate it for the rest of the session
+TEST_CONFIG = types.MappingProxyType({
+    name: types.MappingProxyType(service) for name, service in TEST_CONFIG.items()
+})
+TIMEOUTS = types.MappingProxyType(TIMEOUTS)
+
+# Connection pool shared by the session-wide HTTP client; keeps well over one
+# warm connection per configured service origin between readiness checks
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=100)
+
+# Read-only sample payloads shared by the session-scoped data fixtures
+SAMPLE_CHARACTER_DATA = types.MappingProxyType({
+    "project_id": "test-project-001",
+    "name": "Test Character",
+    "personality_description": "A brave and loyal warrior with a strong sense of justice.",
+    "appearance_description": "Tall, muscular build with dark hair and piercing blue eyes."
+})
+
+SAMPLE_STORY_DATA = types.MappingProxyType({
+    "project_id": "test-project-001",
+    "title": "Test Story",
+    "genre": "fantasy",
+    "premise": "A hero's journey to save the kingdom from darkness.",
+    "characters": ("Test Character",)
+})
 
 
 @pytest.fixture(scope="session")
@@ -80,32 +98,65 @@ def timeouts():
     return TIMEOUTS
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 async def http_client():
-    """HTTP client for making requests to services."""
-    async with httpx.AsyncClient(timeout=TIMEOUTS["http_request"]) as client:
+    """Pooled HTTP client shared by all tests in the session."""
+    async with httpx.AsyncClient(
+        timeout=TIMEOUTS["http_request"],
+        limits=HTTP_LIMITS,
+        http2=True
+    ) as client:
         yield client
 
 
-@pytest.fixture
-async def brain_service_websocket(test_config):
-    """WebSocket connection to brain service."""
+async def _connect_brain_service(test_config):
+    """Open a WebSocket to the brain service, skipping the test if it is unreachable."""
+    import websockets
+
     uri = test_config["brain_service"]["websocket_url"]
     try:
-        async with websockets.connect(
+        websocket = await websockets.connect(
             uri,
             timeout=TIMEOUTS["websocket_connect"],
-            ping_interval=None,
-            ping_timeout=None
-        ) as websocket:
-            logger.info(f"Connected to brain service WebSocket: {uri}")
-            yield websocket
+            ping_interval=20
+        )
     except Exception as e:
-        logger.error(f"Failed to connect to brain service WebSocket {uri}: {e}")
+        logger.error("Failed to connect to brain service WebSocket %s: %s", uri, e)
         pytest.skip(f"Brain service WebSocket not available: {e}")
 
+    logger.info("Connected to brain service WebSocket: %s", uri)
+    return websocket
 
-@pytest.fixture
+
+@pytest.fixture(scope="session")
+async def brain_service_websocket(test_config):
+    """WebSocket connection to brain service, shared across the session."""
+    websocket = await _connect_brain_service(test_config)
+    try:
+        yield websocket
+    finally:
+        await websocket.close()
+
+
+@pytest.fixture(scope="session")
+async def brain_service_channel(test_config):
+    """Id-multiplexed channel to the brain service, shared across the session.
+
+    Uses its own connection, since its reader task consumes every incoming
+    message; brain_service_websocket stays free for raw recv() calls.
+    """
+    from tests.utils.test_helpers import WSChannel
+
+    websocket = await _connect_brain_service(test_config)
+    channel = WSChannel(websocket)
+    try:
+        yield channel
+    finally:
+        await channel.aclose()
+        await websocket.close()
+
+
+@pytest.fixture(scope="session")
 def mock_neo4j_connection():
     """Mock Neo4j connection for testing."""
     mock_connection = AsyncMock()
@@ -114,7 +165,7 @@ def mock_neo4j_connection():
     return mock_connection
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_embedding_service():
     """Mock embedding service for testing."""
     mock_service = MagicMock()
@@ -123,97 +174,134 @@ def mock_embedding_service():
     return mock_service
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_character_data():
-    """Sample character data for testing."""
-    return {
-        "project_id": "test-project-001",
-        "name": "Test Character",
-        "personality_description": "A brave and loyal warrior with a strong sense of justice.",
-        "appearance_description": "Tall, muscular build with dark hair and piercing blue eyes."
-    }
+    """Sample character data for testing (read-only; copy with dict() to modify)."""
+    return SAMPLE_CHARACTER_DATA
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_story_data():
-    """Sample story data for testing."""
-    return {
-        "project_id": "test-project-001",
-        "title": "Test Story",
-        "genre": "fantasy",
-        "premise": "A hero's journey to save the kingdom from darkness.",
-        "characters": ["Test Character"]
-    }
+    """Sample story data for testing (read-only; copy with dict() to modify)."""
+    return SAMPLE_STORY_DATA
+
+
+@pytest.fixture(scope="session")
+def sample_character_json(sample_character_data):
+    """Sample character data pre-serialized as JSON bytes for request bodies."""
+    return orjson.dumps(dict(sample_character_data))
+
+
+@pytest.fixture(scope="session")
+def sample_story_json(sample_story_data):
+    """Sample story data pre-serialized as JSON bytes for request bodies."""
+    return orjson.dumps(dict(sample_story_data))
 
 
 @pytest.fixture(scope="session")
-async def docker_client():
+def docker_client():
     """Docker client for managing test containers."""
+    client = None
     try:
+        import docker
         client = docker.from_env()
-        yield client
-        client.close()
+        client.ping()
     except Exception as e:
-        logger.warning(f"Docker not available: {e}")
-        yield None
+        if client is not None:
+            client.close()
+        logger.warning("Docker not available: %s", e)
+        pytest.skip(f"Docker not available: {e}")
+
+    # Fallback in case session teardown never runs
+    atexit.register(client.close)
+    yield client
+    atexit.unregister(client.close)
+    client.close()
 
 
 class ServiceHealthChecker:
     """Helper class for checking service health."""
 
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], http_session: Optional[httpx.AsyncClient] = None):
         self.config = config
+        self._owns_session = http_session is None
+        self.http_session = http_session or httpx.AsyncClient(limits=HTTP_LIMITS, http2=True)
+        self._healthy: Dict[str, bool] = {}
+        self._health_urls = {name: f"{cfg['http_url']}/health" for name, cfg in config.items()}
+        # Caps concurrent in-flight probes to one per configured service
+        self._probe_slots = asyncio.Semaphore(len(config))
+
+    async def aclose(self):
+        """Close the HTTP session if this checker created it."""
+        if self._owns_session:
+            await self.http_session.aclose()
 
     async def wait_for_service(self, service_name: str, timeout: int = 30) -> bool:
         """Wait for a service to become healthy."""
         if service_name not in self.config:
-            logger.error(f"Unknown service: {service_name}")
+            logger.error("Unknown service: %s", service_name)
             return False
 
+        if self._healthy.get(service_name):
+            return True
+
         service_config = self.config[service_name]
-        health_url = f"{service_config['http_url']}/health"
-
-        start_time = time.time()
-        async with httpx.AsyncClient() as client:
-            while time.time() - start_time < timeout:
-                try:
-                    response = await client.get(health_url, timeout=2)
-                    if response.status_code == 200:
-                        logger.info(f"{service_name} is healthy")
-                        return True
-                except Exception as e:
-                    logger.debug(f"Health check failed for {service_name}: {e}")
-
-                await asyncio.sleep(1)
-
-        logger.error(f"{service_name} failed to become healthy within {timeout}s")
+        health_url = self._health_urls[service_name]
+        get = self.http_session.get
+
+        deadline = time.monotonic() + timeout
+        attempt = 0
+        while time.monotonic() < deadline:
+            try:
+                async with self._probe_slots:
+                    # Cheap TCP pre-check so a closed port fails fast without an HTTP round-trip
+                    _, writer = await asyncio.wait_for(
+                        asyncio.open_connection(service_config["host"], service_config["port"]),
+                        timeout=1
+                    )
+                    writer.close()
+                    with suppress(Exception):
+                        await writer.wait_closed()
+
+                    response = await get(health_url, timeout=1)
+
+                if response.status_code == 200:
+                    logger.info("%s is healthy", service_name)
+                    self._healthy[service_name] = True
+                    return True
+            except Exception as e:
+                logger.debug("Health check failed for %s: %s", service_name, e)
+
+            # Exponential backoff: 50ms, 100ms, 200ms, ... capped at 500ms
+            await asyncio.sleep(min(0.5, 0.05 * 2 ** attempt))
+            attempt += 1
+
+        logger.error("%s failed to become healthy within %ss", service_name, timeout)
         return False
 
     async def check_all_services(self) -> Dict[str, bool]:
         """Check health of all configured services."""
-        results = {}
-        tasks = []
-
-        for service_name in self.config.keys():
-            task = asyncio.create_task(
-                self.wait_for_service(service_name, TIMEOUTS["service_startup"])
-            )
-            tasks.append((service_name, task))
+        service_names = list(self.config.keys())
+        outcomes = await asyncio.gather(
+            *(self.wait_for_service(name, TIMEOUTS["service_startup"]) for name in service_names),
+            return_exceptions=True
+        )
 
-        for service_name, task in tasks:
-            try:
-                results[service_name] = await task
-            except Exception as e:
-                logger.error(f"Error checking {service_name}: {e}")
+        results = {}
+        for service_name, outcome in zip(service_names, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error("Error checking %s: %s", service_name, outcome)
                 results[service_name] = False
+            else:
+                results[service_name] = outcome
 
         return results
 
 
 @pytest.fixture(scope="session")
-async def service_health_checker(test_config):
+async def service_health_checker(test_config, http_client):
     """Service health checker fixture."""
-    return ServiceHealthChecker(test_config)
+    return ServiceHealthChecker(test_config, http_client)
 
 
 @pytest.fixture(scope="session")
@@ -225,18 +313,30 @@ async def services_ready(service_health_checker):
     # Log results
     for service, is_ready in results.items():
         status = "READY" if is_ready else "NOT READY"
-        logger.info(f"{service}: {status}")
+        logger.info("%s: %s", service, status)
 
     return results
 
 
 class TestMetrics:
-    """Test metrics collector."""
+    """Test metrics collector.
+
+    Results and measurements are stored column-wise (one sequence per field,
+    with float columns in array.array) so summaries reduce over contiguous
+    floats instead of walking a list of dicts.
+    """
 
     def __init__(self):
         self.metrics = {
             "start_time": time.time(),
-            "test_results": [],
+            "start_counter_ns": time.perf_counter_ns(),
+            "test_results": {
+                "names": [],
+                "passed": [],
+                "durations": array.array("d"),
+                "errors": [],
+                "timestamps": array.array("d")
+            },
             "performance_data": {},
             "error_count": 0,
             "total_tests": 0
@@ -244,32 +344,34 @@ class TestMetrics:
 
     def record_test_result(self, test_name: str, passed: bool, duration: float, error: str = None):
         """Record test result."""
-        self.metrics["test_results"].append({
-            "name": test_name,
-            "passed": passed,
-            "duration": duration,
-            "error": error,
-            "timestamp": time.time()
-        })
+        results = self.metrics["test_results"]
+        results["names"].append(test_name)
+        results["passed"].append(passed)
+        results["durations"].append(duration)
+        results["errors"].append(error)
+        results["timestamps"].append(time.time())
         self.metrics["total_tests"] += 1
         if not passed:
             self.metrics["error_count"] += 1
 
     def record_performance(self, operation: str, duration: float, metadata: Dict = None):
         """Record performance metric."""
-        if operation not in self.metrics["performance_data"]:
-            self.metrics["performance_data"][operation] = []
-
-        self.metrics["performance_data"][operation].append({
-            "duration": duration,
-            "metadata": metadata or {},
-            "timestamp": time.time()
-        })
+        data = self.metrics["performance_data"].get(operation)
+        if data is None:
+            data = self.metrics["performance_data"][operation] = {
+                "durations": array.array("d"),
+                "metadata": [],
+                "timestamps": array.array("d")
+            }
+
+        data["durations"].append(duration)
+        data["metadata"].append(metadata or {})
+        data["timestamps"].append(time.time())
 
     def get_summary(self) -> Dict[str, Any]:
         """Get test summary."""
-        total_duration = time.time() - self.metrics["start_time"]
-        passed_tests = sum(1 for result in self.metrics["test_results"] if result["passed"])
+        total_duration = (time.perf_counter_ns() - self.metrics["start_counter_ns"]) / 1e9
+        passed_tests = sum(self.metrics["test_results"]["passed"])
 
         return {
             "total_duration": total_duration,
@@ -280,11 +382,15 @@ class TestMetrics:
             "performance_summary": self._get_performance_summary()
         }
 
+    def to_json(self) -> bytes:
+        """Serialize the test summary to JSON bytes."""
+        return orjson.dumps(self.get_summary())
+
     def _get_performance_summary(self) -> Dict[str, Any]:
         """Get performance summary."""
         summary = {}
-        for operation, measurements in self.metrics["performance_data"].items():
-            durations = [m["duration"] for m in measurements]
+        for operation, data in self.metrics["performance_data"].items():
+            durations = data["durations"]
             if durations:
                 summary[operation] = {
                     "count": len(durations),
@@ -312,11 +418,11 @@ class PerformanceTimer:
         self.start_time = None
 
     def __enter__(self):
-        self.start_time = time.time()
+        self.start_time = time.perf_counter_ns()
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        duration = time.time() - self.start_time
+        duration = (time.perf_counter_ns() - self.start_time) / 1e9
         self.test_metrics.record_performance(self.operation, duration, self.metadata)
 
 
@@ -329,34 +435,52 @@ def performance_timer(test_metrics):
 
 
 # Test data generators
-def generate_test_characters(count: int = 5) -> list:
-    """Generate test character data."""
-    characters = []
-    for i in range(count):
-        characters.append({
+STORY_GENRES = ("fantasy", "sci-fi", "drama")
+
+
+@functools.lru_cache(maxsize=32)
+def _character_templates(count: int) -> tuple:
+    """Build character records once per count; callers only ever get copies."""
+    return tuple(
+        {
             "project_id": f"test-project-{i:03d}",
             "name": f"Character {i+1}",
             "personality_description": f"Personality description for character {i+1}",
             "appearance_description": f"Appearance description for character {i+1}"
-        })
-    return characters
+        }
+        for i in range(count)
+    )
 
 
-def generate_test_stories(count: int = 3) -> list:
-    """Generate test story data."""
-    stories = []
-    for i in range(count):
-        stories.append({
+@functools.lru_cache(maxsize=32)
+def _story_templates(count: int) -> tuple:
+    """Build story records once per count; callers only ever get copies."""
+    return tuple(
+        {
             "project_id": f"test-project-{i:03d}",
             "title": f"Test Story {i+1}",
-            "genre": ["fantasy", "sci-fi", "drama"][i % 3],
+            "genre": STORY_GENRES[i % 3],
             "premise": f"Premise for test story {i+1}",
-            "characters": [f"Character {j+1}" for j in range(i+1, i+3)]
-        })
-    return stories
+            "characters": tuple(f"Character {j+1}" for j in range(i+1, i+3))
+        }
+        for i in range(count)
+    )
 
 
-@pytest.fixture
+def generate_test_characters(count: int = 5) -> list:
+    """Generate test character data."""
+    return [dict(character) for character in _character_templates(count)]
+
+
+def generate_test_stories(count: int = 3) -> list:
+    """Generate test story data."""
+    return [
+        {**story, "characters": list(story["characters"])}
+        for story in _story_templates(count)
+    ]
+
+
+@pytest.fixture(scope="session")
 def test_data_generator():
     """Test data generator fixture."""
     return {
@@ -365,37 +489,25 @@ def test_data_generator():
     }
 
 
+# Service markers share their names with the TEST_CONFIG entries
+_SERVICE_MARKERS = frozenset(TEST_CONFIG)
+
+
+def pytest_collection_modifyitems(config, items):
+    """Run tests that need the same services back to back.
+
+    Grouping by required-service markers keeps each service's pooled
+    connections warm between consecutive tests. The sort is stable, so
+    collection order is preserved within a group.
+    """
+    items.sort(key=lambda item: tuple(sorted(
+        {marker.name for marker in item.iter_markers() if marker.name in _SERVICE_MARKERS}
+    )))
+
+
 # Cleanup helpers
-@pytest.fixture(autouse=True)
-async def cleanup_test_data():
-    """Cleanup test data after each test."""
+@pytest.fixture
+def cleanup_test_data():
+    """Cleanup test data after the requesting test (opt-in)."""
     yield
     # Cleanup logic would go here
-    # For now, we'll just log
-    logger.debug("Test cleanup completed")
-
-
-# Skip markers for optional services
-def pytest_configure(config):
-    """Configure pytest markers."""
-    config.addinivalue_line(
-        "markers", "brain_service: tests that require brain service"
-    )
-    config.addinivalue_line(
-        "markers", "character_service: tests that require character service"
-    )
-    config.addinivalue_line(
-        "markers", "story_service: tests that require story service"
-    )
-    config.addinivalue_line(
-        "markers", "orchestrator: tests that require orchestrator service"
-    )
-    config.addinivalue_line(
-        "markers", "performance: performance tests"
-    )
-    config.addinivalue_line(
-        "markers", "integration: integration tests"
-    )
-    config.addinivalue_line(
-        "markers", "e2e: end-to-end tests"
-    )
\ No newline at end of file
@@ -49,7 +49,8 @@ class TestCrossServiceDataFlow:
         healthy_services = [name for name, status in service_results.items() if status["healthy"]]
         assert len(healthy_services) > 0, "At least one service should be healthy"
 
-    async def test_character_creation_to_brain_service_flow(self, test_config, sample_character_data, performance_timer):
+    async def test_character_creation_to_brain_service_flow(self, test_config, sample_character_data,
+                                                          sample_character_json, performance_timer):
         """Test character creation flow from character service to brain service."""
         character_service_url = test_config["character_service"]["http_url"]
         brain_service_url = test_config["brain_service"]["websocket_url"]
@@ -70,7 +71,8 @@ class TestCrossServiceDataFlow:
                     client,
                     "POST",
                     "/characters",
-                    json=sample_character_data
+                    content=sample_character_json,
+                    headers={"Content-Type": "application/json"}
                 )
 
                 if create_response.status_code not in [200, 201]:
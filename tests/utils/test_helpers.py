@@ -58,6 +58,74 @@ class WebSocketTestClient:
         return response
 
 
+class WSChannel:
+    """Request/response channel multiplexed over one shared WebSocket.
+
+    Each request is tagged with a unique "id" and a single reader task routes
+    every reply carrying that id to the future awaiting it, so several
+    requests can be in flight on one connection at once. Replies without a
+    matching id are ignored.
+    """
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._reader = asyncio.create_task(self._dispatch())
+
+    async def _dispatch(self):
+        """Route incoming messages to their waiting requests until the socket closes."""
+        error: Exception = ConnectionError("WebSocket closed")
+        try:
+            async for raw in self.websocket:
+                try:
+                    message = json.loads(raw)
+                except json.JSONDecodeError:
+                    logger.debug("Ignoring non-JSON WebSocket message: %r", raw)
+                    continue
+                # Request ids are always strings; anything else cannot be a reply
+                if not isinstance(message, dict) or not isinstance(message.get("id"), str):
+                    logger.debug("Ignoring WebSocket message without a request id: %r", raw)
+                    continue
+                future = self._pending.pop(message["id"], None)
+                if future is not None and not future.done():
+                    future.set_result(message)
+        except asyncio.CancelledError:
+            error = ConnectionError("WebSocket channel closed")
+            raise
+        except Exception as e:
+            error = e
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            self._pending.clear()
+
+    async def request(self, tool: str, timeout: float = 5.0, **kwargs) -> Dict[str, Any]:
+        """Send a tool call and wait for the reply with the same id."""
+        if self._reader.done():
+            raise ConnectionError("WebSocket channel is no longer reading replies")
+
+        message_id = f"test-{uuid.uuid4().hex}"
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message_id] = future
+        try:
+            await self.websocket.send(json.dumps({"id": message_id, "tool": tool, **kwargs}))
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(message_id, None)
+
+    # Drop-in for WebSocketTestClient.send_and_receive
+    send_and_receive = request
+
+    async def aclose(self):
+        """Stop the reader task."""
+        self._reader.cancel()
+        try:
+            await self._reader
+        except asyncio.CancelledError:
+            pass
+
+
 class MCPTestClient:
     """MCP client for testing MCP tool calls."""
 
@@ -75,6 +143,16 @@ class MCPTestClient:
         finally:
             self.websocket = None
 
+    @asynccontextmanager
+    async def connect_multiplexed(self):
+        """Connect to MCP WebSocket and share it between concurrent requests."""
+        async with websockets.connect(self.websocket_url) as websocket:
+            channel = WSChannel(websocket)
+            try:
+                yield channel
+            finally:
+                await channel.aclose()
+
     async def test_tool(self, tool_name: str, **params) -> Dict[str, Any]:
         """Test a specific MCP tool."""
         async with self.connect() as client:
@@ -0,0 +1,74 @@
+"""
+Unit tests for the id-multiplexed WSChannel against a local WebSocket server.
+"""
+import asyncio
+import json
+
+import pytest
+import websockets
+
+from tests.utils.test_helpers import MCPTestClient
+
+
+async def _scripted_server(websocket):
+    """Reply to each request after its "delay", preceded by any "noise" frames."""
+    async def reply(message):
+        await asyncio.sleep(message.get("delay", 0))
+        for frame in message.get("noise", []):
+            await websocket.send(json.dumps(frame))
+        await websocket.send(json.dumps({"id": message["id"], "status": "success",
+                                         "tool": message["tool"]}))
+
+    replies = set()
+    try:
+        async for raw in websocket:
+            task = asyncio.create_task(reply(json.loads(raw)))
+            replies.add(task)
+            task.add_done_callback(replies.discard)
+    finally:
+        for task in replies:
+            task.cancel()
+
+
+@pytest.fixture
+async def ws_url():
+    """URL of a local scripted WebSocket server."""
+    async with websockets.serve(_scripted_server, "localhost", 0) as server:
+        port = server.sockets[0].getsockname()[1]
+        yield f"ws://localhost:{port}"
+
+
+@pytest.mark.fast
+class TestWSChannel:
+    """Tests for routing replies over a shared WebSocket."""
+
+    async def test_routes_out_of_order_replies_by_id(self, ws_url):
+        async with MCPTestClient(ws_url).connect_multiplexed() as channel:
+            slow, fast = await asyncio.gather(
+                channel.request("slow", delay=0.2),
+                channel.request("fast", delay=0.0),
+            )
+
+        assert slow["tool"] == "slow"
+        assert fast["tool"] == "fast"
+
+    async def test_ignores_frames_without_a_string_id(self, ws_url):
+        noise = [["not", "a", "dict"], "text", 42, {"id": ["unhashable"]}, {"no_id": True}]
+
+        async with MCPTestClient(ws_url).connect_multiplexed() as channel:
+            first = await channel.request("first", noise=noise, timeout=1.0)
+            second = await channel.request("second", timeout=1.0)
+
+        assert first["status"] == "success"
+        assert second["tool"] == "second"
+
+    async def test_close_fails_pending_and_later_requests(self, ws_url):
+        async with MCPTestClient(ws_url).connect_multiplexed() as channel:
+            pending = asyncio.create_task(channel.request("hang", delay=10, timeout=5.0))
+            await asyncio.sleep(0.05)
+            await channel.aclose()
+
+            with pytest.raises(ConnectionError):
+                await pending
+            with pytest.raises(ConnectionError):
+                await channel.request("after_close", timeout=5.0)